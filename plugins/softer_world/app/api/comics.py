@@ -2,18 +2,29 @@
 Comic generation endpoints.
 """
 
+import hashlib
 import io
+import os
 
-from flask import Blueprint, send_file, jsonify, request
+from flask import Blueprint, send_file, send_from_directory, jsonify, request, make_response
 from PIL import Image, ImageDraw
 
-from app.core.comic_service import ComicService
+from app.core.comic_service import ComicService, IMAGE_FORMATS
 from app.config import Config
 
 comics_bp = Blueprint('comics', __name__)
 comic_service = ComicService()
 
 
+def _negotiate_mimetype() -> str:
+    """Pick WebP only for clients that explicitly accept it, JPEG otherwise."""
+    return request.accept_mimetypes.best_match(list(IMAGE_FORMATS), default='image/jpeg')
+
+
+def _comic_etag(comic_number: int, width: int, height: int, mimetype: str) -> str:
+    """Build the ETag for a rendered comic from its cache key and the render version."""
+    etag_input = f"{Config.RENDER_VERSION}:{comic_number}:{width}x{height}:{mimetype}"
+    return hashlib.sha1(etag_input.encode()).hexdigest()
 
 
 @comics_bp.route('')
@@ -30,14 +41,18 @@ def random_comic():
         if height is None:
             height = Config.DEFAULT_IMAGE_HEIGHT
         
-        img_io, comic_metadata = comic_service.generate_comic_image(None, width, height)
+        mimetype = _negotiate_mimetype()
+        image_format, extension = IMAGE_FORMATS[mimetype]
+        img_io, comic_metadata = comic_service.generate_comic_image(None, width, height, image_format)
         
-        return send_file(
+        response = send_file(
             img_io,
-            mimetype='image/jpeg',
+            mimetype=mimetype,
             as_attachment=False,
-            download_name=f"softer_world_{comic_metadata.get('num', 'random')}.jpg"
+            download_name=f"softer_world_{comic_metadata.get('num', 'random')}.{extension}"
         )
+        response.vary.add('Accept')
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -56,14 +71,49 @@ def specific_comic(comic_number: int):
         if height is None:
             height = Config.DEFAULT_IMAGE_HEIGHT
         
-        img_io, comic_metadata = comic_service.generate_comic_image(comic_number, width, height)
+        mimetype = _negotiate_mimetype()
+        image_format, extension = IMAGE_FORMATS[mimetype]
+        
+        # A specific comic at a given size never changes, so let clients and
+        # CDNs cache it and answer revalidations without rendering
+        etag = _comic_etag(comic_number, width, height, mimetype)
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            response.cache_control.public = True
+            response.cache_control.max_age = Config.COMIC_HTTP_MAX_AGE
+            response.vary.add('Accept')
+            return response
+        
+        # Stream previously rendered comics straight from the disk cache
+        filename = comic_service.disk_cache_filename(comic_number, width, height, image_format)
+        if os.path.isfile(os.path.join(comic_service.disk_cache_directory, filename)):
+            response = send_from_directory(
+                comic_service.disk_cache_directory,
+                filename,
+                mimetype=mimetype,
+                as_attachment=False,
+                download_name=f"softer_world_{comic_number}.{extension}",
+                etag=etag,
+                max_age=Config.COMIC_HTTP_MAX_AGE
+            )
+            response.vary.add('Accept')
+            return response
+        
+        img_io, comic_metadata = comic_service.generate_comic_image(
+            comic_number, width, height, image_format
+        )
         
-        return send_file(
+        response = send_file(
             img_io,
-            mimetype='image/jpeg',
+            mimetype=mimetype,
             as_attachment=False,
-            download_name=f"softer_world_{comic_number}.jpg"
+            download_name=f"softer_world_{comic_number}.{extension}",
+            etag=etag,
+            max_age=Config.COMIC_HTTP_MAX_AGE
         )
+        response.vary.add('Accept')
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
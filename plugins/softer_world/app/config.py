@@ -22,8 +22,25 @@ class Config:
     DEFAULT_FONT_SIZE = 18
     DEFAULT_LINE_SPACING = 1.1
     
+    # Bump whenever rendering output changes (layout, fonts, filters, encoder
+    # settings); it is part of comic ETags and disk-cache file names, so a
+    # deploy invalidates both client caches and previously rendered files
+    RENDER_VERSION = 1
+    
+    # Cache settings
+    COMIC_IMAGE_CACHE_SIZE = 256
+    COMIC_IMAGE_CACHE_TTL = 3600  # seconds
+    COMIC_HTTP_MAX_AGE = 86400  # seconds clients/CDNs may reuse a specific comic
+    WEATHER_IMAGE_CACHE_SIZE = 64
+    WEATHER_IMAGE_CACHE_TTL = 300  # seconds; wttr.in images only change every few minutes
+    
     # Output settings
     OUTPUT_DIRECTORY = "build"
+    COMIC_CACHE_DIRECTORY = os.path.join(OUTPUT_DIRECTORY, "cache")
+    # Only these (width, height) renders are written to COMIC_CACHE_DIRECTORY, so
+    # arbitrary client-chosen sizes can't grow it: the default plus the Inky Frame
+    # 4", 5.7" and 7.3" panels
+    COMIC_DISK_CACHE_SIZES = frozenset({(600, 448), (640, 400), (800, 480)})
     
     # API Keys
     OPENWEATHERMAP_API_KEY = os.environ.get('OPENWEATHERMAP_API_KEY') or '805bdda8dde4ad3384006509982278d7'
@@ -3,33 +3,122 @@ Comic generation service layer.
 """
 
 import io
-from typing import Optional, Tuple
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
 
+import requests
+from cachetools import TTLCache
 from PIL import Image, ImageDraw
 from font_roboto import Roboto
 from PIL import ImageFont
 
 from app.config import Config
-from app.utils.comic_generator import fetch_comic_metadata, create_qr_code
+from app.utils.comic_generator import (
+    fetch_comic_metadata,
+    fetch_many_comic_metadata,
+    create_qr_code,
+    random_comic_number
+)
 from app.utils.generator_utils import (
     download_image_from_url,
     calculate_image_dimensions,
+    fit_text_to_rectangle,
     render_text_in_rectangle
 )
+from app.utils.http import SESSION
+
+ATTRIBUTION_TEXT = "www.asofterworld.com"
+
+# Servable image formats: mimetype -> (PIL format, file extension)
+IMAGE_FORMATS = {
+    'image/jpeg': ('JPEG', 'jpg'),
+    'image/webp': ('WEBP', 'webp'),
+}
+IMAGE_EXTENSIONS = {image_format: extension for image_format, extension in IMAGE_FORMATS.values()}
+
+# Encoder settings per supported output format
+IMAGE_SAVE_OPTIONS = {
+    'JPEG': {'quality': 95},
+    'WEBP': {'quality': 82, 'method': 2},
+}
+
+# Worker pool for rendering work that can overlap the outbound fetches
+render_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="comic-render")
 
 
 class ComicService:
     """Service class for comic generation operations."""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or SESSION
         self.default_font = ImageFont.truetype(Roboto, Config.DEFAULT_FONT_SIZE)
+        
+        # Encoded image bytes and metadata keyed by (comic_number, width, height, format)
+        self._image_cache = TTLCache(
+            maxsize=Config.COMIC_IMAGE_CACHE_SIZE,
+            ttl=Config.COMIC_IMAGE_CACHE_TTL
+        )
+        self._image_cache_lock = threading.Lock()
+        
+        # Rendered images are also written here so the web server can stream
+        # repeat requests straight from disk
+        self.disk_cache_directory = os.path.abspath(Config.COMIC_CACHE_DIRECTORY)
+        
+        # Fitted attribution font keyed by rectangle size; the text and the
+        # QR-derived rectangle are constant, so this is computed once
+        self._attribution_fonts: Dict[Tuple[int, int], Optional[ImageFont.FreeTypeFont]] = {}
     
     def fetch_comic_metadata(self, comic_number: Optional[int] = None) -> dict:
         """Fetch comic metadata."""
-        return fetch_comic_metadata(comic_number)
+        return fetch_comic_metadata(comic_number, self.session)
+    
+    def fetch_many_comic_metadata(self, comic_numbers: Iterable[int]) -> List[dict]:
+        """Fetch metadata for several comics concurrently."""
+        return fetch_many_comic_metadata(comic_numbers, self.session)
+    
+    def disk_cache_filename(self, comic_number: int, width: int, height: int,
+                            image_format: str) -> str:
+        """Get the file name of a rendered comic inside disk_cache_directory."""
+        extension = IMAGE_EXTENSIONS[image_format]
+        return f"{comic_number}_{width}x{height}_v{Config.RENDER_VERSION}.{extension}"
+    
+    def _write_disk_cache(self, filename: str, image_bytes: bytes):
+        """Atomically write rendered image bytes into the disk cache, unless already there."""
+        if os.path.isfile(os.path.join(self.disk_cache_directory, filename)):
+            return
+        
+        try:
+            os.makedirs(self.disk_cache_directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.disk_cache_directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as temp_file:
+                    temp_file.write(image_bytes)
+                os.chmod(temp_path, 0o644)
+                os.replace(temp_path, os.path.join(self.disk_cache_directory, filename))
+            except OSError:
+                os.unlink(temp_path)
+                raise
+        except OSError as error:
+            # The disk cache is an optimization; serving the image still works
+            logging.getLogger(__name__).warning(f"Could not write {filename} to disk cache: {error}")
+    
+    def _attribution_font(self, width: int, height: int) -> Optional[ImageFont.FreeTypeFont]:
+        """Get the largest font at which the attribution fits, or None if it doesn't."""
+        rect_size = (width, height)
+        if rect_size not in self._attribution_fonts:
+            text_layout = fit_text_to_rectangle(
+                ATTRIBUTION_TEXT, self.default_font, width, height, Config.DEFAULT_LINE_SPACING
+            )
+            self._attribution_fonts[rect_size] = text_layout[0] if text_layout else None
+        return self._attribution_fonts[rect_size]
     
     def generate_comic_image(self, comic_number: Optional[int] = None, 
-                           width: int = None, height: int = None) -> Tuple[io.BytesIO, dict]:
+                           width: int = None, height: int = None,
+                           image_format: str = 'JPEG') -> Tuple[io.BytesIO, dict]:
         """
         Generate a Softer World comic image and return it as a BytesIO object.
         
@@ -37,6 +126,7 @@ class ComicService:
             comic_number: Specific comic number, or None for random
             width: Canvas width
             height: Canvas height
+            image_format: Output format, a key of IMAGE_SAVE_OPTIONS
             
         Returns:
             Tuple of (BytesIO object containing the generated image, comic metadata)
@@ -45,7 +135,48 @@ class ComicService:
             width = Config.DEFAULT_IMAGE_WIDTH
         if height is None:
             height = Config.DEFAULT_IMAGE_HEIGHT
+        
+        # Pick the random comic up front so random hits share the cache
+        if comic_number is None:
+            comic_number = random_comic_number()
+        
+        cache_key = (comic_number, width, height, image_format)
+        with self._image_cache_lock:
+            cached = self._image_cache.get(cache_key)
+        
+        if cached is None:
+            cached = self._render_comic_image(comic_number, width, height, image_format)
+            with self._image_cache_lock:
+                self._image_cache[cache_key] = cached
+            
+            # Only known panel sizes go to disk; the directory is never pruned
+            if (width, height) in Config.COMIC_DISK_CACHE_SIZES:
+                self._write_disk_cache(
+                    self.disk_cache_filename(comic_number, width, height, image_format), cached[0]
+                )
+        
+        image_bytes, comic_metadata = cached
+        return io.BytesIO(image_bytes), dict(comic_metadata)
+    
+    def _render_comic_image(self, comic_number: int, width: int, height: int,
+                            image_format: str) -> Tuple[bytes, dict]:
+        """
+        Render a comic image and encode it.
+        
+        Args:
+            comic_number: Specific comic number
+            width: Canvas width
+            height: Canvas height
+            image_format: Output format, a key of IMAGE_SAVE_OPTIONS
             
+        Returns:
+            Tuple of (encoded image bytes, comic metadata)
+        """
+        # Start the QR code while the page and image download, since it only
+        # needs the comic number (it is only pasted, so share the cached image)
+        comic_url = f"https://www.asofterworld.com/index.php?id={comic_number}/"
+        qr_code_future = render_executor.submit(create_qr_code, comic_url, False)
+        
         # Fetch comic metadata
         comic_metadata = self.fetch_comic_metadata(comic_number)
         
@@ -53,20 +184,26 @@ class ComicService:
         img_url = comic_metadata.get("img")
         if not img_url:
             raise ValueError("No image URL found in comic metadata")
-        comic_image = download_image_from_url(img_url)
+        comic_image = download_image_from_url(
+            img_url, self.session, (width, height - Config.COMIC_BOTTOM_MARGIN)
+        )
         
         # Calculate comic dimensions and position
         comic_width, comic_height, comic_x, comic_y = calculate_image_dimensions(
             comic_image, width, height, Config.COMIC_BOTTOM_MARGIN
         )
         
-        # Resize comic if necessary
+        # Resize comic if necessary; reducing_gap box-reduces large downscales
+        # before the Lanczos pass for near-identical quality at lower cost
         if (comic_width, comic_height) != comic_image.size:
-            comic_image = comic_image.resize((comic_width, comic_height))
+            comic_image = comic_image.resize(
+                (comic_width, comic_height),
+                resample=Image.Resampling.LANCZOS,
+                reducing_gap=3.0
+            )
         
-        # Create QR code
-        comic_url = f"https://www.asofterworld.com/index.php?id={comic_metadata.get('num')}/"
-        qr_code_image = create_qr_code(comic_url)
+        # Collect QR code
+        qr_code_image = qr_code_future.result()
         qr_width, qr_height = qr_code_image.size
         
         # Calculate QR code position (bottom right)
@@ -100,18 +237,18 @@ class ComicService:
                 (text_area_x, text_area_y, text_area_x + text_area_width, text_area_y + text_area_height)
             )
         
-        # Render website attribution
-        render_text_in_rectangle(
-            drawing_context,
-            "www.asofterworld.com",
-            self.default_font,
-            (0, 0, 0),  # Black text
-            (qr_x, qr_y + qr_height, qr_x + qr_width, qr_y + qr_height + Config.QR_CODE_BOTTOM_OFFSET)
-        )
+        # Render website attribution with its precomputed font
+        attribution_font = self._attribution_font(qr_width, Config.QR_CODE_BOTTOM_OFFSET)
+        if attribution_font:
+            drawing_context.text(
+                (qr_x, qr_y + qr_height),
+                ATTRIBUTION_TEXT,
+                (0, 0, 0),  # Black text
+                font=attribution_font
+            )
         
-        # Save to BytesIO
+        # Encode in the requested format
         img_io = io.BytesIO()
-        output_canvas.save(img_io, 'JPEG', quality=95)
-        img_io.seek(0)
+        output_canvas.save(img_io, image_format, **IMAGE_SAVE_OPTIONS[image_format])
         
-        return img_io, comic_metadata
+        return img_io.getvalue(), comic_metadata
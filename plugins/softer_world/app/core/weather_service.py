@@ -6,17 +6,23 @@ import io
 from typing import IO
 from typing import Optional
 
+import requests
 from PIL import Image
 
+from app.utils.http import SESSION
 from app.utils.weather_generator import fetch_weather_image
 
 
 class WeatherService:
     """Service class for weather operations."""
     
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or SESSION
+    
     def get_weather_image(self, zipcode: str, view_option: str = "0", 
                          add_frame: bool = True, width: Optional[int] = None, 
-                         height: Optional[int] = None) -> Image.Image:
+                         height: Optional[int] = None,
+                         target_mode: Optional[str] = "RGB") -> Image.Image:
         """
         Get weather image as PIL Image.
         
@@ -26,11 +32,13 @@ class WeatherService:
             add_frame: Whether to add a frame around the output
             width: Optional target width for scaling
             height: Optional target height for scaling
+            target_mode: Image mode to convert to, or None to keep the PNG's mode
             
         Returns:
             PIL Image object of the weather
         """
-        return fetch_weather_image(zipcode, view_option, add_frame, width, height)
+        return fetch_weather_image(zipcode, view_option, add_frame, width, height,
+                                   self.session, target_mode)
     
     def get_weather_image_as_bytes(self, zipcode: str, view_option: str = "0", 
                                   add_frame: bool = True, width: Optional[int] = None,
@@ -5,15 +5,20 @@ This module contains the core functions for generating Softer World comic images
 Extracted from __main__.py to be reusable by the server.
 """
 
+import functools
+import html
 import logging
-import math
 import random
+import re
 import sys
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
 
+import lxml.html
+import numpy as np
 import qrcode
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
 from PIL import Image, ImageDraw, ImageFont
 from font_roboto import Roboto
 
@@ -23,6 +28,7 @@ from app.utils.generator_utils import (
     calculate_image_dimensions,
     render_text_in_rectangle
 )
+from app.utils.http import SESSION, DEFAULT_TIMEOUT
 
 # Configuration constants
 DEFAULT_IMAGE_WIDTH = 600
@@ -35,6 +41,20 @@ QR_CODE_SIZE = 2
 QR_CODE_BORDER = 2
 QR_CODE_BOTTOM_OFFSET = 20
 DEFAULT_LINE_SPACING = 1.1
+LATEST_COMIC_NUMBER = 1242
+
+# Matches the comic <img> tag on the page, capturing its src and title; other
+# attributes may appear around them, but src must come before title
+_COMIC_IMG_RE = re.compile(
+    rb'<div\b[^>]*\sid="comicimg"[^>]*>\s*<img\b[^>]*?\ssrc="([^"]+)"[^>]*?\stitle="([^"]*)"',
+    re.IGNORECASE
+)
+
+# Precompiled equivalent of the '#comicimg > img' CSS selector
+_COMIC_IMG_XPATH = etree.XPath('//*[@id="comicimg"]/img')
+
+# Worker pool for overlapping the page fetches of batched metadata lookups
+fetch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="comic-fetch")
 
 # Initialize font and dimensions
 default_font = ImageFont.truetype(Roboto, DEFAULT_FONT_SIZE)
@@ -42,54 +62,72 @@ default_font = ImageFont.truetype(Roboto, DEFAULT_FONT_SIZE)
 
 
 
-def create_comic_url(comic_number: Optional[int] = None) -> str:
-    if comic_number is not None:        
-        return f"https://www.asofterworld.com/index.php?id={comic_number}"
-    else:
-        # random number between 1 and 1242
-        comic_number = random.randint(1, 1242)
-        return f"https://www.asofterworld.com/index.php?id={comic_number}"
+def random_comic_number() -> int:
+    """Pick a random comic number between 1 and LATEST_COMIC_NUMBER."""
+    return random.randint(1, LATEST_COMIC_NUMBER)
+
 
-def fetch_comic_metadata(comic_number: Optional[int] = None) -> dict:
+def create_comic_url(comic_number: int) -> str:
+    """Build the page URL of a comic; pick random numbers with random_comic_number."""
+    return f"https://www.asofterworld.com/index.php?id={comic_number}"
+
+def fetch_comic_metadata(comic_number: Optional[int] = None,
+                         session: Optional[requests.Session] = None) -> dict:
     """
     Fetch comic metadata from the HTML page.
     
+    Results are cached per comic number, so a random pick is made before
+    the cache lookup and repeat fetches skip the network entirely.
+    
     Args:
         comic_number: Specific comic number, or None for random
+        session: Session to fetch with (default: shared SESSION)
         
     Returns:
         Dictionary containing comic metadata
     """
+    if comic_number is None:
+        comic_number = random_comic_number()
+    
+    # Copy so callers cannot mutate the cached entry
+    return dict(_fetch_comic_metadata(comic_number, session or SESSION))
+
+
+def fetch_many_comic_metadata(comic_numbers: Iterable[int],
+                              session: Optional[requests.Session] = None) -> List[dict]:
+    """
+    Fetch metadata for several comics, overlapping their page fetches.
+    
+    Args:
+        comic_numbers: Comic numbers to fetch
+        session: Session to fetch with (default: shared SESSION)
+        
+    Returns:
+        List of metadata dictionaries in the order of comic_numbers
+        
+    Raises:
+        requests.RequestException: If any of the requests fail
+    """
+    http = session or SESSION
+    return list(fetch_executor.map(lambda number: fetch_comic_metadata(number, http), comic_numbers))
+
+
+@functools.lru_cache(maxsize=2048)
+def _fetch_comic_metadata(comic_number: int, http: requests.Session) -> dict:
+    """Fetch and parse the metadata for a specific comic number."""
     comic_url = create_comic_url(comic_number)
     
     try:
-        response = requests.get(comic_url)
+        response = http.get(comic_url, timeout=DEFAULT_TIMEOUT)
         response.raise_for_status()
         
-        # Parse HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
         # Extract comic image and metadata
-        comic_img_element = soup.select_one('#comicimg > img')
-        if not comic_img_element:
-            raise ValueError("Could not find comic image element")
-        
-        img_src = comic_img_element.get('src')
-        title = comic_img_element.get('title', '')
-        
-        # Extract comic number from URL or use the passed/generated one
-        if comic_number is None:
-            # Extract from URL if it was randomly generated
-            import re
-            match = re.search(r'id=(\d+)', comic_url)
-            comic_num = int(match.group(1)) if match else None
-        else:
-            comic_num = comic_number
+        img_src, title = parse_comic_image(response.content)
         
         return {
             'img': img_src,
             'title': title,
-            'num': comic_num,
+            'num': comic_number,
             'alt': title,  # Using title as alt text as specified
             'url': comic_url
         }
@@ -106,16 +144,71 @@ def fetch_comic_metadata(comic_number: Optional[int] = None) -> dict:
 
 
 
-def create_qr_code(comic_url: str) -> Image.Image:
+def parse_comic_image(page_content: bytes) -> Tuple[str, str]:
+    """
+    Extract the comic image source and title from a comic page.
+    
+    The page layout is stable, so a precompiled regex finds the image tag
+    without building a parse tree; lxml with a precompiled XPath selector is
+    only used as a fallback when the markup doesn't match.
+    
+    Args:
+        page_content: Raw HTML bytes of the comic page
+        
+    Returns:
+        Tuple of (image source URL, image title)
+        
+    Raises:
+        ValueError: If the comic image element cannot be found
+    """
+    match = _COMIC_IMG_RE.search(page_content)
+    if match:
+        try:
+            return (html.unescape(match.group(1).decode('utf-8')),
+                    html.unescape(match.group(2).decode('utf-8')))
+        except UnicodeDecodeError:
+            pass  # Not UTF-8, let the parser use the declared charset
+    
+    # Fall back to the C-based lxml parser, always on bytes (it rejects text
+    # with an encoding declaration, e.g. an XHTML prolog). Tell it UTF-8 when
+    # the page decodes as such, since lxml otherwise assumes Latin-1 for bytes
+    # without a declared charset; other pages keep their declared charset
+    try:
+        page_content.decode('utf-8')
+        html_parser = lxml.html.HTMLParser(encoding='utf-8')
+    except UnicodeDecodeError:
+        html_parser = None
+    page_tree = lxml.html.fromstring(page_content, parser=html_parser)
+    comic_img_elements = _COMIC_IMG_XPATH(page_tree)
+    if not comic_img_elements:
+        raise ValueError("Could not find comic image element")
+    
+    comic_img_element = comic_img_elements[0]
+    return comic_img_element.get('src'), comic_img_element.get('title', '')
+
+
+def create_qr_code(comic_url: str, copy: bool = True) -> Image.Image:
     """
     Generate a QR code for the comic URL.
     
+    QR codes are cached per URL. By default each call returns a copy so
+    callers may modify the image freely; callers that only read from it
+    (e.g. to paste it) can pass copy=False to get the shared cached image.
+    
     Args:
         comic_url: URL to encode in QR code
+        copy: Whether to return a private copy of the cached image
         
     Returns:
         PIL Image of the QR code
     """
+    qr_code_image = _render_qr_code(comic_url)
+    return qr_code_image.copy() if copy else qr_code_image
+
+
+@functools.lru_cache(maxsize=2048)
+def _render_qr_code(comic_url: str) -> Image.Image:
+    """Build and rasterize the QR code for a URL."""
     qr_generator = qrcode.QRCode(
         version=1,
         box_size=QR_CODE_SIZE,
@@ -124,7 +217,13 @@ def create_qr_code(comic_url: str) -> Image.Image:
     qr_generator.add_data(comic_url)
     qr_generator.make(fit=True)
     
-    return qr_generator.make_image(fill_color="black", back_color="white").get_image()
+    # Build the bitmap straight from the module matrix (border included) as
+    # one array, repeating each module into a QR_CODE_SIZE square; this skips
+    # the image factory's per-module rectangle drawing
+    module_matrix = np.array(qr_generator.get_matrix(), dtype=bool)
+    module_pixels = np.where(module_matrix, 0, 255).astype(np.uint8)
+    module_pixels = module_pixels.repeat(QR_CODE_SIZE, axis=0).repeat(QR_CODE_SIZE, axis=1)
+    return Image.fromarray(module_pixels, "L")
 
 
 
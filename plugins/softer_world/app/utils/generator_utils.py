@@ -4,21 +4,28 @@ Generator Utilities Module
 This module contains common utility functions shared across different generators.
 """
 
+import functools
 import io
 import logging
-import math
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 
 import requests
 from PIL import Image, ImageDraw, ImageFont
 
+from app.utils.http import SESSION, DEFAULT_TIMEOUT
 
-def download_image_from_url(image_url: str) -> Image.Image:
+
+def download_image_from_url(image_url: str,
+                            session: Optional[requests.Session] = None,
+                            target_size: Optional[Tuple[int, int]] = None) -> Image.Image:
     """
     Download and open an image from URL.
     
     Args:
         image_url: URL of the image
+        session: Session to fetch with (default: shared SESSION)
+        target_size: Optional (width, height) box the image will be scaled to fit;
+            JPEGs are then decoded at a reduced scale that still covers it
         
     Returns:
         PIL Image object
@@ -30,12 +37,21 @@ def download_image_from_url(image_url: str) -> Image.Image:
     logger = logging.getLogger(__name__)
     logger.debug(f"Downloading image from: {image_url}")
     
+    http = session or SESSION
+    
     try:
-        response = requests.get(image_url)
+        response = http.get(image_url, timeout=DEFAULT_TIMEOUT)
         response.raise_for_status()
         
         image = Image.open(io.BytesIO(response.content))
         logger.debug(f"Downloaded image dimensions: {image.size}")
+        
+        # Let libjpeg decode straight to a reduced scale (1/2, 1/4, 1/8) that
+        # still covers the fitted size; must happen before the image is loaded
+        if target_size and image.format == 'JPEG':
+            scaling_ratio = min(target_size[0] / image.width, target_size[1] / image.height)
+            image.draft('RGB', (int(image.width * scaling_ratio), int(image.height * scaling_ratio)))
+        
         return image
         
     except requests.RequestException as error:
@@ -92,6 +108,143 @@ def calculate_image_dimensions(original_image: Image.Image, canvas_width: int, c
     return new_width, new_height, offset_x, offset_y
 
 
+@functools.lru_cache(maxsize=256)
+def load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """
+    Load a TrueType font, reusing previously loaded (path, size) pairs.
+    
+    Args:
+        path: Path to the font file
+        size: Font size in points
+        
+    Returns:
+        FreeType font object
+    """
+    return ImageFont.truetype(path, size)
+
+
+def _find_line_end(font: ImageFont.FreeTypeFont, words: list, word_widths: list,
+                   start: int, max_width: int, space_width: float) -> int:
+    """
+    Find the index one past the last word that fits on a line starting at start.
+    
+    The line is first estimated by summing the precomputed word widths, then
+    checked against a single measurement of the joined line and adjusted a
+    word at a time, since kerning and hinting can make the sum differ by a pixel.
+    
+    Args:
+        font: Font used to measure the text
+        words: All words of the text
+        word_widths: Advance width of each word in this font
+        start: Index of the first word on the line
+        max_width: Maximum line width in pixels
+        space_width: Advance width of a single space in this font
+        
+    Returns:
+        End index of the line (equal to start if the first word doesn't fit)
+    """
+    # Estimate by adding one word width at a time
+    line_end = start
+    line_width = word_widths[start]
+    while line_width <= max_width:
+        line_end += 1
+        if line_end == len(words):
+            break
+        line_width += space_width + word_widths[line_end]
+
+    # Back off while the measured line overflows, then extend while it fits
+    while line_end > start and font.getbbox(" ".join(words[start:line_end]))[2] > max_width:
+        line_end -= 1
+    while line_end < len(words) and font.getbbox(" ".join(words[start:line_end + 1]))[2] <= max_width:
+        line_end += 1
+
+    return line_end
+
+
+def _layout_text(text: str, font: ImageFont.FreeTypeFont, rect_width: int, rect_height: int,
+                 line_spacing_multiplier: float) -> Optional[List[str]]:
+    """
+    Break text into lines that fit a rectangle at the given font size.
+    
+    Args:
+        text: Text content to lay out
+        font: Font object to measure with
+        rect_width: Rectangle width
+        rect_height: Rectangle height
+        line_spacing_multiplier: Multiplier for line height spacing
+        
+    Returns:
+        List of line strings, or None if the text doesn't fit
+    """
+    line_height = int(font.size * line_spacing_multiplier)
+    max_lines_possible = rect_height // line_height
+    text_lines = []
+
+    # Break text into lines that fit within the rectangle width
+    words = text.split(" ")
+    word_index = 0
+
+    # Measure each word once; lines are estimated by adding these up
+    word_widths = [font.getlength(word) for word in words]
+    space_width = font.getlength(" ")
+
+    while len(text_lines) < max_lines_possible and word_index < len(words):
+        line_end = _find_line_end(font, words, word_widths, word_index, rect_width, space_width)
+
+        if line_end > word_index:  # Only add non-empty lines
+            text_lines.append(" ".join(words[word_index:line_end]))
+            word_index = line_end
+        else:
+            break  # Word too long for line, need smaller font
+
+    # Check if all text fits
+    if len(text_lines) <= max_lines_possible and word_index == len(words):
+        return text_lines
+    return None
+
+
+def fit_text_to_rectangle(
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    rect_width: int,
+    rect_height: int,
+    line_spacing_multiplier: float = 1.1
+) -> Optional[Tuple[ImageFont.FreeTypeFont, List[str]]]:
+    """
+    Find the largest font size, up to the given font's, at which text fits a rectangle.
+    
+    Args:
+        text: Text content to fit
+        font: Font object at the maximum size to use
+        rect_width: Rectangle width
+        rect_height: Rectangle height
+        line_spacing_multiplier: Multiplier for line height spacing
+        
+    Returns:
+        Tuple of (fitted font, text lines) or None if text doesn't fit
+    """
+    # Try the requested size first, since most text fits without shrinking
+    text_lines = _layout_text(text, font, rect_width, rect_height, line_spacing_multiplier)
+    if text_lines is not None:
+        return font, text_lines
+
+    # Otherwise binary search for the largest smaller size that fits
+    text_layout = None
+    low, high = 1, font.size - 1
+    while low <= high:
+        size = (low + high) // 2
+        candidate_font = load_font(font.path, size)
+        candidate_lines = _layout_text(text, candidate_font, rect_width, rect_height,
+                                       line_spacing_multiplier)
+        if candidate_lines is None:
+            high = size - 1
+        else:
+            text_layout = (candidate_font, candidate_lines)
+            low = size + 1
+
+    return text_layout
+
+
 def render_text_in_rectangle(
     canvas: ImageDraw.ImageDraw,
     text: str,
@@ -121,66 +274,43 @@ def render_text_in_rectangle(
     rect_width = rectangle_bounds[2] - rectangle_bounds[0]
     rect_height = rectangle_bounds[3] - rectangle_bounds[1]
 
-    # Iteratively reduce font size until text fits in rectangle
-    current_font = font
-    while current_font.size > 0:
-        line_height = int(current_font.size * line_spacing_multiplier)
-        max_lines_possible = math.floor(rect_height / line_height)
-        text_lines = []
-
-        # Break text into lines that fit within the rectangle width
-        remaining_words = text.split(" ")
-
-        while len(text_lines) < max_lines_possible and len(remaining_words) > 0:
-            current_line_words = []
-
-            # Add words to current line until width limit is reached
-            while (len(remaining_words) > 0 and 
-                   current_font.getbbox(" ".join(current_line_words + [remaining_words[0]]))[2] <= rect_width):
-                current_line_words.append(remaining_words.pop(0))
-
-            if current_line_words:  # Only add non-empty lines
-                text_lines.append(" ".join(current_line_words))
-            else:
-                break  # Word too long for line, need smaller font
-
-        # Check if all text fits
-        if len(text_lines) <= max_lines_possible and len(remaining_words) == 0:
-            # Calculate starting Y position based on vertical alignment
-            if vertical_alignment == 'top':
-                start_y = int(rectangle_bounds[1])
-            else:  # center alignment
-                total_text_height = len(text_lines) * line_height
-                start_y = int(rectangle_bounds[1] + (rect_height / 2) - (total_text_height / 2) - (line_height - current_font.size) / 2)
-
-            # Track actual text bounds
-            text_bounds = [rectangle_bounds[2], int(start_y), rectangle_bounds[0], int(start_y + len(text_lines) * line_height)]
-
-            # Render each line
-            current_y = start_y
-            for line_text in text_lines:
-                line_width = current_font.getbbox(line_text)[2]
-                
-                # Calculate X position based on horizontal alignment
-                if horizontal_alignment == 'center':
-                    line_x = int(rectangle_bounds[0] + (rect_width / 2) - (line_width / 2))
-                else:  # left alignment
-                    line_x = rectangle_bounds[0]
-                    
-                # Update bounds tracking
-                text_bounds[0] = min(text_bounds[0], int(line_x))
-                text_bounds[2] = max(text_bounds[2], int(line_x + line_width))
-                
-                # Draw the line
-                canvas.text((line_x, current_y), line_text, text_color, font=current_font)
-                current_y += line_height
-
-            return (text_bounds[0], text_bounds[1], text_bounds[2], text_bounds[3])
-
-        # Try smaller font size
-        current_font = ImageFont.truetype(current_font.path, current_font.size - 1)
-    
-    return None  # Text doesn't fit even at smallest font size
+    text_layout = fit_text_to_rectangle(text, font, rect_width, rect_height, line_spacing_multiplier)
+    if text_layout is None:
+        return None  # Text doesn't fit even at smallest font size
+    current_font, text_lines = text_layout
+
+    line_height = int(current_font.size * line_spacing_multiplier)
+
+    # Calculate starting Y position based on vertical alignment
+    if vertical_alignment == 'top':
+        start_y = rectangle_bounds[1]
+    else:  # center alignment
+        total_text_height = len(text_lines) * line_height
+        start_y = int(rectangle_bounds[1] + (rect_height / 2) - (total_text_height / 2) - (line_height - current_font.size) / 2)
+
+    # Track actual text bounds
+    text_bounds = [rectangle_bounds[2], start_y, rectangle_bounds[0], start_y + len(text_lines) * line_height]
+
+    # Render each line
+    current_y = start_y
+    for line_text in text_lines:
+        line_width = current_font.getbbox(line_text)[2]
+        
+        # Calculate X position based on horizontal alignment
+        if horizontal_alignment == 'center':
+            line_x = int(rectangle_bounds[0] + (rect_width / 2) - (line_width / 2))
+        else:  # left alignment
+            line_x = rectangle_bounds[0]
+            
+        # Update bounds tracking
+        text_bounds[0] = min(text_bounds[0], line_x)
+        text_bounds[2] = max(text_bounds[2], line_x + line_width)
+        
+        # Draw the line
+        canvas.text((line_x, current_y), line_text, text_color, font=current_font)
+        current_y += line_height
+
+    return (text_bounds[0], text_bounds[1], text_bounds[2], text_bounds[3])
 
 
 def generate_filename_suffix(metadata: dict, canvas_width: int, canvas_height: int, 
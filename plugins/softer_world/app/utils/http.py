@@ -0,0 +1,37 @@
+"""
+HTTP Session Module
+
+This module provides the shared requests session used for all outbound fetches,
+so repeated requests to the same host reuse pooled keep-alive connections.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeout in seconds
+DEFAULT_TIMEOUT = (3, 10)
+
+
+def create_session() -> requests.Session:
+    """
+    Create a requests session with connection pooling and retries.
+
+    Returns:
+        Configured requests.Session
+    """
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=2, backoff_factor=0.2)
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+# Module-level session shared across generators and services
+SESSION = create_session()
@@ -6,14 +6,29 @@ This module contains functions for fetching and processing weather data.
 
 import io
 import logging
+import threading
 from typing import Optional
 
 import requests
+from cachetools import TTLCache
 from PIL import Image
 
+from app.config import Config
+from app.utils.http import SESSION, DEFAULT_TIMEOUT
+
+# Downloaded PNG bytes keyed by wttr.in URL, so repeat requests for the same
+# zipcode and options within the TTL skip the network
+_weather_png_cache = TTLCache(
+    maxsize=Config.WEATHER_IMAGE_CACHE_SIZE,
+    ttl=Config.WEATHER_IMAGE_CACHE_TTL
+)
+_weather_png_cache_lock = threading.Lock()
+
 
 def fetch_weather_image(zipcode: str, view_option: str = "0", add_frame: bool = True, 
-                       width: Optional[int] = None, height: Optional[int] = None) -> Image.Image:
+                       width: Optional[int] = None, height: Optional[int] = None,
+                       session: Optional[requests.Session] = None,
+                       target_mode: Optional[str] = "RGB") -> Image.Image:
     """
     Fetch weather PNG image from wttr.in for a given zipcode using metric units.
     
@@ -23,6 +38,9 @@ def fetch_weather_image(zipcode: str, view_option: str = "0", add_frame: bool =
         add_frame: Whether to add a frame around the output
         width: Optional target width for scaling
         height: Optional target height for scaling
+        session: Session to fetch with (default: shared SESSION)
+        target_mode: Image mode to convert to (default: "RGB" for JPEG output),
+            or None to keep the PNG's own mode, e.g. to keep its transparency
         
     Returns:
         PIL Image object of the weather PNG
@@ -43,24 +61,51 @@ def fetch_weather_image(zipcode: str, view_option: str = "0", add_frame: bool =
     
     logger.debug(f"Fetching weather image from: {weather_url}")
     
+    http = session or SESSION
+    
     try:
-        response = requests.get(weather_url)
-        response.raise_for_status()
+        with _weather_png_cache_lock:
+            weather_png = _weather_png_cache.get(weather_url)
         
-        weather_image = Image.open(io.BytesIO(response.content))
+        if weather_png is None:
+            response = http.get(weather_url, timeout=DEFAULT_TIMEOUT)
+            response.raise_for_status()
+            weather_png = response.content
+            with _weather_png_cache_lock:
+                _weather_png_cache[weather_url] = weather_png
+        
+        weather_image = Image.open(io.BytesIO(weather_png))
         logger.info(f"Successfully fetched weather image for zipcode {zipcode}")
         logger.debug(f"Weather image dimensions: {weather_image.size}")
         
-        # Convert PNG to JPEG format
-        if weather_image.mode in ("RGBA", "P"):
-            # Convert to RGB for JPEG compatibility
-            weather_image = weather_image.convert("RGB")
+        target_size = (width, height) if width is not None and height is not None else None
+        needs_conversion = target_mode is not None and weather_image.mode != target_mode
+        
+        # Convert after shrinking where possible, so fewer pixels are converted.
+        # Palette images must be converted first (Pillow only resizes them with
+        # NEAREST), and so must images with alpha, whose resize is alpha-weighted
+        convert_first = needs_conversion and (
+            target_size is None
+            or width * height >= weather_image.width * weather_image.height
+            or weather_image.mode == "P"
+            or "A" in weather_image.mode
+        )
+        if convert_first:
+            weather_image = weather_image.convert(target_mode)
         
-        # Scale image if dimensions are provided
-        if width is not None and height is not None:
-            weather_image = weather_image.resize((width, height), Image.Resampling.LANCZOS)
+        # Scale image if dimensions are provided; reducing_gap box-reduces
+        # large downscales before the Lanczos pass (no effect when upscaling)
+        if target_size is not None:
+            weather_image = weather_image.resize(
+                target_size,
+                resample=Image.Resampling.LANCZOS,
+                reducing_gap=2.0
+            )
             logger.debug(f"Scaled weather image to {width}x{height}")
         
+        if needs_conversion and not convert_first:
+            weather_image = weather_image.convert(target_mode)
+        
         return weather_image
         
     except requests.RequestException as error:
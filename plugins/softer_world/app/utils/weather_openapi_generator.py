@@ -4,21 +4,102 @@ Weather OpenAPI Generator Module
 This module creates Apple Weather-style weather images using OpenWeatherMap API.
 """
 
+import functools
 import io
 import logging
-import math
+import numpy as np
 import requests
-from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List
-from PIL import Image, ImageDraw, ImageFont
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
+from PIL import Image, ImageColor, ImageDraw, ImageFont
 from app.config import Config
+from app.utils.generator_utils import load_font
+from app.utils.http import SESSION, DEFAULT_TIMEOUT
+
+
+@functools.lru_cache(maxsize=None)
+def load_forecast_fonts() -> Tuple[ImageFont.FreeTypeFont, ImageFont.FreeTypeFont, ImageFont.FreeTypeFont]:
+    """
+    Load the large, medium and small forecast fonts.
+    
+    Helvetica is only present on macOS; elsewhere Pillow's default font is
+    used for all three. Either way the result is cached, so the missing
+    file is only probed once per process.
+    
+    Returns:
+        Tuple of (large, medium, small) fonts
+    """
+    try:
+        return (
+            load_font("/System/Library/Fonts/Helvetica.ttc", 72),
+            load_font("/System/Library/Fonts/Helvetica.ttc", 24),
+            load_font("/System/Library/Fonts/Helvetica.ttc", 16),
+        )
+    except OSError:
+        default_font = ImageFont.load_default()
+        return default_font, default_font, default_font
+
+
+@functools.lru_cache(maxsize=1024)
+def text_width(font: ImageFont.FreeTypeFont, text: str) -> int:
+    """
+    Measure the rendered width of text, reusing earlier measurements.
+    
+    Forecast labels repeat a small set of hours, days, icons and
+    temperatures, so most lookups skip FreeType entirely. Fonts are keyed by
+    identity, so pass the shared ones from load_forecast_fonts; freshly
+    loaded font objects would never hit and would only fill the cache.
+    
+    Args:
+        font: Font to measure with, from load_forecast_fonts
+        text: Text to measure
+        
+    Returns:
+        Width of the text's bounding box in pixels
+    """
+    text_bbox = font.getbbox(text)
+    return text_bbox[2] - text_bbox[0]
+
+
+@functools.lru_cache(maxsize=4096)
+def _geocode_zipcode(zipcode: str, api_key: str, http: requests.Session) -> tuple[float, float]:
+    """Look up the coordinates of a zipcode; they don't change, so results are cached."""
+    geocoding_url = f"http://api.openweathermap.org/geo/1.0/zip"
+    params = {
+        'zip': f"{zipcode},US",
+        'appid': api_key
+    }
+    
+    response = http.get(geocoding_url, params=params, timeout=DEFAULT_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    return data['lat'], data['lon']
+
+
+# Worker pool for rendering work that can overlap the API round-trips
+render_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="weather-render")
 
 
 class WeatherOpenAPIGenerator:
     """Generate Apple Weather-style weather images using OpenWeatherMap API."""
     
-    def __init__(self):
+    # OpenWeatherMap icon code to weather symbol
+    ICON_MAP = {
+        '01d': '☀️', '01n': '🌙',  # clear sky
+        '02d': '⛅', '02n': '☁️',  # few clouds
+        '03d': '☁️', '03n': '☁️',  # scattered clouds
+        '04d': '☁️', '04n': '☁️',  # broken clouds
+        '09d': '🌧️', '09n': '🌧️',  # shower rain
+        '10d': '🌦️', '10n': '🌧️',  # rain
+        '11d': '⛈️', '11n': '⛈️',  # thunderstorm
+        '13d': '❄️', '13n': '❄️',  # snow
+        '50d': '🌫️', '50n': '🌫️',  # mist
+    }
+    
+    def __init__(self, session: Optional[requests.Session] = None):
         self.api_key = Config.OPENWEATHERMAP_API_KEY
+        self.http = session or SESSION
         self.logger = logging.getLogger(__name__)
         
         # Apple Weather-style colors
@@ -29,23 +110,20 @@ class WeatherOpenAPIGenerator:
             'text_primary': '#FFFFFF',
             'text_secondary': '#E5E7EB',
             'text_muted': '#9CA3AF',
-            'card_bg': 'rgba(255, 255, 255, 0.1)',
-            'card_border': 'rgba(255, 255, 255, 0.2)',
+            'card_bg': (255, 255, 255, 25),  # ~10% white
+            'card_border': (255, 255, 255, 50),  # ~20% white
         }
         
-    def get_coordinates_from_zipcode(self, zipcode: str) -> tuple[float, float]:
-        """Convert US zipcode to lat/lon coordinates using OpenWeatherMap Geocoding API."""
-        geocoding_url = f"http://api.openweathermap.org/geo/1.0/zip"
-        params = {
-            'zip': f"{zipcode},US",
-            'appid': self.api_key
+        # Parse the color strings once instead of on every draw call
+        self.colors = {
+            name: ImageColor.getrgb(color) if isinstance(color, str) else color
+            for name, color in self.colors.items()
         }
         
+    def get_coordinates_from_zipcode(self, zipcode: str) -> tuple[float, float]:
+        """Convert US zipcode to lat/lon coordinates using OpenWeatherMap Geocoding API."""
         try:
-            response = requests.get(geocoding_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return data['lat'], data['lon']
+            return _geocode_zipcode(zipcode, self.api_key, self.http)
         except Exception as e:
             self.logger.error(f"Error getting coordinates for zipcode {zipcode}: {e}")
             raise ValueError(f"Could not get coordinates for zipcode {zipcode}")
@@ -62,7 +140,7 @@ class WeatherOpenAPIGenerator:
         }
         
         try:
-            response = requests.get(url, params=params)
+            response = self.http.get(url, params=params, timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -71,35 +149,20 @@ class WeatherOpenAPIGenerator:
     
     def get_weather_icon_symbol(self, icon_code: str) -> str:
         """Convert OpenWeatherMap icon code to weather symbol."""
-        icon_map = {
-            '01d': '☀️', '01n': '🌙',  # clear sky
-            '02d': '⛅', '02n': '☁️',  # few clouds
-            '03d': '☁️', '03n': '☁️',  # scattered clouds
-            '04d': '☁️', '04n': '☁️',  # broken clouds
-            '09d': '🌧️', '09n': '🌧️',  # shower rain
-            '10d': '🌦️', '10n': '🌧️',  # rain
-            '11d': '⛈️', '11n': '⛈️',  # thunderstorm
-            '13d': '❄️', '13n': '❄️',  # snow
-            '50d': '🌫️', '50n': '🌫️',  # mist
-        }
-        return icon_map.get(icon_code, '☁️')
+        return self.ICON_MAP.get(icon_code, '☁️')
     
     def create_gradient_background(self, width: int, height: int) -> Image.Image:
         """Create a gradient background similar to Apple Weather."""
-        img = Image.new('RGB', (width, height))
-        draw = ImageDraw.Draw(img)
+        # Create vertical gradient, one interpolated color per row
+        ratio = (np.arange(height) / height)[:, None]
+        top = np.array([59, 130, 246])  # 3B82F6
+        bottom = np.array([30, 64, 175])  # 1E40AF
         
-        # Create vertical gradient
-        for y in range(height):
-            ratio = y / height
-            # Interpolate between top and bottom colors
-            r = int(59 + (30 - 59) * ratio)  # 3B82F6 to 1E40AF
-            g = int(130 + (64 - 130) * ratio)
-            b = int(246 + (175 - 246) * ratio)
-            color = (r, g, b)
-            draw.line([(0, y), (width, y)], fill=color)
+        # Interpolate between top and bottom colors (truncating like int())
+        row_colors = (top + (bottom - top) * ratio).astype(np.uint8)
+        pixels = np.broadcast_to(row_colors[:, None, :], (height, width, 3))
         
-        return img
+        return Image.fromarray(np.ascontiguousarray(pixels), 'RGB')
     
     def draw_main_weather(self, draw: ImageDraw.Draw, weather_data: Dict, 
                          width: int, height: int, font_large: ImageFont, 
@@ -115,32 +178,27 @@ class WeatherOpenAPIGenerator:
         high_low = f"H:{int(weather_data['daily'][0]['temp']['max'])}° L:{int(weather_data['daily'][0]['temp']['min'])}°"
         
         # Draw location
-        location_bbox = draw.textbbox((0, 0), location, font=font_medium)
-        location_width = location_bbox[2] - location_bbox[0]
+        location_width = text_width(font_medium, location)
         draw.text(((width - location_width) // 2, 40), location, 
                  fill=self.colors['text_secondary'], font=font_medium)
         
         # Draw main temperature
-        temp_bbox = draw.textbbox((0, 0), temp, font=font_large)
-        temp_width = temp_bbox[2] - temp_bbox[0]
+        temp_width = text_width(font_large, temp)
         draw.text(((width - temp_width) // 2, 80), temp, 
                  fill=self.colors['text_primary'], font=font_large)
         
         # Draw condition
-        condition_bbox = draw.textbbox((0, 0), condition, font=font_medium)
-        condition_width = condition_bbox[2] - condition_bbox[0]
+        condition_width = text_width(font_medium, condition)
         draw.text(((width - condition_width) // 2, 160), condition, 
                  fill=self.colors['text_secondary'], font=font_medium)
         
         # Draw feels like
-        feels_bbox = draw.textbbox((0, 0), feels_like, font=font_small)
-        feels_width = feels_bbox[2] - feels_bbox[0]
+        feels_width = text_width(font_small, feels_like)
         draw.text(((width - feels_width) // 2, 190), feels_like, 
                  fill=self.colors['text_muted'], font=font_small)
         
         # Draw high/low
-        hl_bbox = draw.textbbox((0, 0), high_low, font=font_small)
-        hl_width = hl_bbox[2] - hl_bbox[0]
+        hl_width = text_width(font_small, high_low)
         draw.text(((width - hl_width) // 2, 210), high_low, 
                  fill=self.colors['text_muted'], font=font_small)
     
@@ -153,41 +211,40 @@ class WeatherOpenAPIGenerator:
         card_height = 120
         draw.rounded_rectangle(
             [(20, y_start), (width - 20, y_start + card_height)],
-            radius=15, fill=(255, 255, 255, 25), outline=(255, 255, 255, 50)
+            radius=15, fill=self.colors['card_bg'], outline=self.colors['card_border']
         )
         
         # Title
         draw.text((35, y_start + 15), "HOURLY FORECAST", 
                  fill=self.colors['text_muted'], font=font_small)
         
+        # Build each item's labels up front (time, icon, temperature)
+        hourly_labels = [
+            (
+                "Now" if i == 0 else time.strftime("%H", time.gmtime(hour_data['dt'])),
+                self.get_weather_icon_symbol(hour_data['weather'][0]['icon']),
+                f"{int(hour_data['temp'])}°"
+            )
+            for i, hour_data in enumerate(hourly_data[:6])
+        ]
+        
         # Hourly items
         item_width = (width - 60) // 6  # Show 6 hours
-        for i, hour_data in enumerate(hourly_data[:6]):
+        for i, (time_str, icon, temp_str) in enumerate(hourly_labels):
             x = 35 + i * item_width
             
-            # Time
-            dt = datetime.fromtimestamp(hour_data['dt'], tz=timezone.utc)
-            time_str = dt.strftime("%H")
-            if i == 0:
-                time_str = "Now"
-            
             # Center time text
-            time_bbox = draw.textbbox((0, 0), time_str, font=font_small)
-            time_width = time_bbox[2] - time_bbox[0]
+            time_width = text_width(font_small, time_str)
             draw.text((x + (item_width - time_width) // 2, y_start + 35), 
                      time_str, fill=self.colors['text_secondary'], font=font_small)
             
             # Weather icon (simplified)
-            icon = self.get_weather_icon_symbol(hour_data['weather'][0]['icon'])
-            icon_bbox = draw.textbbox((0, 0), icon, font=font_small)
-            icon_width = icon_bbox[2] - icon_bbox[0]
+            icon_width = text_width(font_small, icon)
             draw.text((x + (item_width - icon_width) // 2, y_start + 55), 
                      icon, font=font_small)
             
             # Temperature
-            temp_str = f"{int(hour_data['temp'])}°"
-            temp_bbox = draw.textbbox((0, 0), temp_str, font=font_small)
-            temp_width = temp_bbox[2] - temp_bbox[0]
+            temp_width = text_width(font_small, temp_str)
             draw.text((x + (item_width - temp_width) // 2, y_start + 85), 
                      temp_str, fill=self.colors['text_primary'], font=font_small)
     
@@ -200,38 +257,40 @@ class WeatherOpenAPIGenerator:
         card_height = 200
         draw.rounded_rectangle(
             [(20, y_start), (width - 20, y_start + card_height)],
-            radius=15, fill=(255, 255, 255, 25), outline=(255, 255, 255, 50)
+            radius=15, fill=self.colors['card_bg'], outline=self.colors['card_border']
         )
         
         # Title
         draw.text((35, y_start + 15), "7-DAY FORECAST", 
                  fill=self.colors['text_muted'], font=font_small)
         
+        # Build each day's labels up front (day name, icon, high, low)
+        daily_labels = [
+            (
+                time.strftime("%a", time.gmtime(day_data['dt'])) if i > 0 else "Today",
+                self.get_weather_icon_symbol(day_data['weather'][0]['icon']),
+                f"{int(day_data['temp']['max'])}°",
+                f"{int(day_data['temp']['min'])}°"
+            )
+            for i, day_data in enumerate(daily_data)
+        ]
+        
         # Daily items
-        for i, day_data in enumerate(daily_data):
+        for i, (day_name, icon, high, low) in enumerate(daily_labels):
             y = y_start + 40 + i * 22
             
             # Day name
-            dt = datetime.fromtimestamp(day_data['dt'], tz=timezone.utc)
-            day_name = dt.strftime("%a") if i > 0 else "Today"
             draw.text((35, y), day_name, fill=self.colors['text_secondary'], font=font_small)
             
             # Weather icon
-            icon = self.get_weather_icon_symbol(day_data['weather'][0]['icon'])
             draw.text((120, y), icon, font=font_small)
             
-            # High/Low temps
-            high = f"{int(day_data['temp']['max'])}°"
-            low = f"{int(day_data['temp']['min'])}°"
-            
             # Right align temperatures
-            high_bbox = draw.textbbox((0, 0), high, font=font_small)
-            high_width = high_bbox[2] - high_bbox[0]
+            high_width = text_width(font_small, high)
             draw.text((width - 80 - high_width, y), high, 
                      fill=self.colors['text_primary'], font=font_small)
             
-            low_bbox = draw.textbbox((0, 0), low, font=font_small)
-            low_width = low_bbox[2] - low_bbox[0]
+            low_width = text_width(font_small, low)
             draw.text((width - 40 - low_width, y), low, 
                      fill=self.colors['text_muted'], font=font_small)
     
@@ -239,23 +298,20 @@ class WeatherOpenAPIGenerator:
                              height: int = 600) -> Image.Image:
         """Generate Apple Weather-style weather image."""
         try:
+            # Render the gradient while the API calls are in flight, since it
+            # only depends on the image size
+            background_future = render_executor.submit(self.create_gradient_background, width, height)
+            
             # Get coordinates and weather data
             lat, lon = self.get_coordinates_from_zipcode(zipcode)
             weather_data = self.fetch_weather_data(lat, lon)
             
-            # Create base image with gradient
-            img = self.create_gradient_background(width, height)
+            # Collect base image with gradient
+            img = background_future.result()
             draw = ImageDraw.Draw(img, 'RGBA')
             
-            # Load fonts (fallback to default if not available)
-            try:
-                font_large = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 72)
-                font_medium = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 24)
-                font_small = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 16)
-            except:
-                font_large = ImageFont.load_default()
-                font_medium = ImageFont.load_default()
-                font_small = ImageFont.load_default()
+            # Load fonts (resolved once per process, including the fallback)
+            font_large, font_medium, font_small = load_forecast_fonts()
             
             # Draw main weather info
             self.draw_main_weather(draw, weather_data, width, height, 
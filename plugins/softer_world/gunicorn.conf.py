@@ -0,0 +1,16 @@
+"""
+Gunicorn configuration for the Softer World Generator.
+"""
+
+bind = "0.0.0.0:5001"
+
+# gevent workers let each process overlap many blocking outbound fetches
+worker_class = "gevent"
+workers = 4
+
+# Concurrent requests per worker; each mostly waits on upstream fetches, so
+# keep this well above the CPU-bound render concurrency
+worker_connections = 200
+
+# Keep client connections open between image requests
+keepalive = 75
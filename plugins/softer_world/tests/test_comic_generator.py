@@ -0,0 +1,49 @@
+"""
+Tests for comic page parsing.
+"""
+
+import pytest
+
+from app.utils.comic_generator import parse_comic_image
+
+
+def test_parse_comic_image_regex_path():
+    page = (b'<html><body><div id="comicimg">\n'
+            b'<img src="https://www.asofterworld.com/clean/a.jpg" title="it&#39;s fine &amp; all" />'
+            b'</div></body></html>')
+
+    assert parse_comic_image(page) == ("https://www.asofterworld.com/clean/a.jpg", "it's fine & all")
+
+
+def test_parse_comic_image_fallback_reordered_attributes():
+    # title before src misses the regex and goes through lxml
+    page = ('<html><body><div id="comicimg">'
+            '<img title="café — ok" src="https://www.asofterworld.com/clean/b.jpg">'
+            '</div></body></html>').encode('utf-8')
+
+    assert parse_comic_image(page) == ("https://www.asofterworld.com/clean/b.jpg", "café — ok")
+
+
+def test_parse_comic_image_fallback_xhtml_prolog():
+    page = ('<?xml version="1.0" encoding="utf-8"?>\n'
+            '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Strict//EN" '
+            '"http://www.w3.org/TR/xhtml1/DTD/xhtml1-strict.dtd">\n'
+            '<html xmlns="http://www.w3.org/1999/xhtml"><body><div id="comicimg">'
+            '<img title="naïve" src="https://www.asofterworld.com/clean/c.jpg" />'
+            '</div></body></html>').encode('utf-8')
+
+    assert parse_comic_image(page) == ("https://www.asofterworld.com/clean/c.jpg", "naïve")
+
+
+def test_parse_comic_image_fallback_declared_charset():
+    # Not valid UTF-8, so the parser follows the page's declared charset
+    page = ('<html><head><meta charset="iso-8859-1"></head><body><div id="comicimg">'
+            '<img title="café" src="https://www.asofterworld.com/clean/d.jpg">'
+            '</div></body></html>').encode('iso-8859-1')
+
+    assert parse_comic_image(page) == ("https://www.asofterworld.com/clean/d.jpg", "café")
+
+
+def test_parse_comic_image_missing_image():
+    with pytest.raises(ValueError):
+        parse_comic_image(b'<html><body><p>No comic here</p></body></html>')
@@ -16,9 +16,10 @@ Examples:
     python __main__.py
 """
 
-import math
+import functools
+import io
 import sys
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 
 import qrcode
 import requests
@@ -37,10 +38,64 @@ QR_CODE_BORDER = 2
 QR_CODE_BOTTOM_OFFSET = 20
 DEFAULT_LINE_SPACING = 1.1
 
-# Initialize font and dimensions
+# Initialize font
 default_font = ImageFont.truetype(Roboto, DEFAULT_FONT_SIZE)
-canvas_width = DEFAULT_IMAGE_WIDTH
-canvas_height = DEFAULT_IMAGE_HEIGHT
+
+
+@functools.lru_cache(maxsize=64)
+def load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """
+    Load a TrueType font, reusing previously loaded (path, size) pairs.
+    
+    Args:
+        path: Path to the font file
+        size: Font size in points
+        
+    Returns:
+        FreeType font object
+    """
+    return ImageFont.truetype(path, size)
+
+
+def layout_text(text: str, font: ImageFont.FreeTypeFont, rect_width: int, rect_height: int,
+                line_spacing_multiplier: float) -> Optional[List[str]]:
+    """
+    Break text into lines that fit a rectangle at the given font size.
+    
+    Args:
+        text: Text content to lay out
+        font: Font object to measure with
+        rect_width: Rectangle width
+        rect_height: Rectangle height
+        line_spacing_multiplier: Multiplier for line height spacing
+        
+    Returns:
+        List of line strings, or None if the text doesn't fit
+    """
+    line_height = int(font.size * line_spacing_multiplier)
+    max_lines_possible = rect_height // line_height
+    text_lines = []
+
+    # Break text into lines that fit within the rectangle width
+    remaining_words = text.split(" ")
+
+    while len(text_lines) < max_lines_possible and len(remaining_words) > 0:
+        current_line_words = []
+
+        # Add words to current line until width limit is reached
+        while (len(remaining_words) > 0 and 
+               font.getbbox(" ".join(current_line_words + [remaining_words[0]]))[2] <= rect_width):
+            current_line_words.append(remaining_words.pop(0))
+
+        if current_line_words:  # Only add non-empty lines
+            text_lines.append(" ".join(current_line_words))
+        else:
+            break  # Word too long for line, need smaller font
+
+    # Check if all text fits
+    if len(text_lines) <= max_lines_possible and len(remaining_words) == 0:
+        return text_lines
+    return None
 
 
 def render_text_in_rectangle(
@@ -72,66 +127,56 @@ def render_text_in_rectangle(
     rect_width = rectangle_bounds[2] - rectangle_bounds[0]
     rect_height = rectangle_bounds[3] - rectangle_bounds[1]
 
-    # Iteratively reduce font size until text fits in rectangle
-    current_font = font
-    while current_font.size > 0:
-        line_height = int(current_font.size * line_spacing_multiplier)
-        max_lines_possible = math.floor(rect_height / line_height)
-        text_lines = []
-
-        # Break text into lines that fit within the rectangle width
-        remaining_words = text.split(" ")
-
-        while len(text_lines) < max_lines_possible and len(remaining_words) > 0:
-            current_line_words = []
-
-            # Add words to current line until width limit is reached
-            while (len(remaining_words) > 0 and 
-                   current_font.getbbox(" ".join(current_line_words + [remaining_words[0]]))[2] <= rect_width):
-                current_line_words.append(remaining_words.pop(0))
-
-            if current_line_words:  # Only add non-empty lines
-                text_lines.append(" ".join(current_line_words))
-            else:
-                break  # Word too long for line, need smaller font
-
-        # Check if all text fits
-        if len(text_lines) <= max_lines_possible and len(remaining_words) == 0:
-            # Calculate starting Y position based on vertical alignment
-            if vertical_alignment == 'top':
-                start_y = int(rectangle_bounds[1])
-            else:  # center alignment
-                total_text_height = len(text_lines) * line_height
-                start_y = int(rectangle_bounds[1] + (rect_height / 2) - (total_text_height / 2) - (line_height - current_font.size) / 2)
-
-            # Track actual text bounds
-            text_bounds = [rectangle_bounds[2], start_y, rectangle_bounds[0], start_y + len(text_lines) * line_height]
-
-            # Render each line
-            current_y = start_y
-            for line_text in text_lines:
-                line_width = current_font.getbbox(line_text)[2]
-                
-                # Calculate X position based on horizontal alignment
-                if horizontal_alignment == 'center':
-                    line_x = int(rectangle_bounds[0] + (rect_width / 2) - (line_width / 2))
-                else:  # left alignment
-                    line_x = rectangle_bounds[0]
-                    
-                # Update bounds tracking
-                text_bounds[0] = min(text_bounds[0], line_x)
-                text_bounds[2] = max(text_bounds[2], line_x + line_width)
-                
-                # Draw the line
-                canvas.text((line_x, current_y), line_text, text_color, font=current_font)
-                current_y += line_height
-
-            return tuple(text_bounds)
-
-        # Try smaller font size
-        current_font = ImageFont.truetype(current_font.path, current_font.size - 1)
-    
-    return None  # Text doesn't fit even at smallest font size
+    # Binary search for the largest font size at which the text fits,
+    # since fitting is monotonic in size
+    current_font, text_lines = None, None
+    low, high = 1, font.size
+    while low <= high:
+        size = (low + high) // 2
+        candidate_font = font if size == font.size else load_font(font.path, size)
+        candidate_lines = layout_text(text, candidate_font, rect_width, rect_height,
+                                      line_spacing_multiplier)
+        if candidate_lines is None:
+            high = size - 1
+        else:
+            current_font, text_lines = candidate_font, candidate_lines
+            low = size + 1
+
+    if current_font is None:
+        return None  # Text doesn't fit even at smallest font size
+
+    line_height = int(current_font.size * line_spacing_multiplier)
+
+    # Calculate starting Y position based on vertical alignment
+    if vertical_alignment == 'top':
+        start_y = rectangle_bounds[1]
+    else:  # center alignment
+        total_text_height = len(text_lines) * line_height
+        start_y = int(rectangle_bounds[1] + (rect_height / 2) - (total_text_height / 2) - (line_height - current_font.size) / 2)
+
+    # Track actual text bounds
+    text_bounds = [rectangle_bounds[2], start_y, rectangle_bounds[0], start_y + len(text_lines) * line_height]
+
+    # Render each line
+    current_y = start_y
+    for line_text in text_lines:
+        line_width = current_font.getbbox(line_text)[2]
+        
+        # Calculate X position based on horizontal alignment
+        if horizontal_alignment == 'center':
+            line_x = int(rectangle_bounds[0] + (rect_width / 2) - (line_width / 2))
+        else:  # left alignment
+            line_x = rectangle_bounds[0]
+            
+        # Update bounds tracking
+        text_bounds[0] = min(text_bounds[0], line_x)
+        text_bounds[2] = max(text_bounds[2], line_x + line_width)
+        
+        # Draw the line
+        canvas.text((line_x, current_y), line_text, text_color, font=current_font)
+        current_y += line_height
+
+    return tuple(text_bounds)
 
 
 def parse_command_line_arguments() -> Tuple[int, int, Optional[int]]:
@@ -150,7 +195,8 @@ def parse_command_line_arguments() -> Tuple[int, int, Optional[int]]:
         # Check if first argument contains dimensions
         if "x" in sys.argv[1]:
             try:
-                target_width, target_height = [int(dimension) for dimension in sys.argv[1].split("x")]
+                width_text, _, height_text = sys.argv[1].partition("x")
+                target_width, target_height = int(width_text), int(height_text)
                 # Comic number would be in second argument if present
                 if len(sys.argv) > 2:
                     comic_number = int(sys.argv[2])
@@ -203,9 +249,10 @@ def download_comic_image(image_url: str) -> Image.Image:
         PIL Image object
     """
     try:
-        response = requests.get(image_url, stream=True)
+        response = requests.get(image_url)
         response.raise_for_status()
-        return Image.open(response.raw)
+        # Decode from a contiguous in-memory buffer rather than the socket
+        return Image.open(io.BytesIO(response.content))
     except requests.RequestException as error:
         print(f"Error downloading comic image: {error}")
         sys.exit(1)
@@ -290,8 +337,6 @@ def main():
     """
     Main function to generate XKCD comic image.
     """
-    global canvas_width, canvas_height
-    
     # Parse command line arguments
     canvas_width, canvas_height, comic_number = parse_command_line_arguments()
     